@@ -15,196 +15,548 @@ TESTS_PATH = os.path.join(PROJECT_ROOT, "tests")
 sys.path.insert(0, GENERATED_PB_PATH)
 sys.path.insert(0, TESTS_PATH)
 
-from wasm_client import WasmClient, ZetaSQLError, StatusCode
+# Prefer the upb (C) protobuf backend: message construction and
+# (de)serialization dominate test setup, and the pure-Python fallback is
+# an order of magnitude slower. setdefault keeps any explicit override
+# (e.g. forcing 'python' to debug) working, and protobuf silently falls
+# back if upb is unavailable.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+from google.protobuf import text_format
+
+from fixtures.sql_samples import PARSE_STATEMENTS
+from wasm_client import WasmClient, ZetaSQLError
 from zetasql.local_service import local_service_pb2
 from zetasql.proto import simple_catalog_pb2
-from zetasql.public import options_pb2, type_pb2, value_pb2
+from zetasql.public import options_pb2, value_pb2
 
 
-@pytest.fixture(scope="session")
-def wasm_path():
-    """Path to the optimized WASM binary."""
+# Test-table schema as a textproto constant; parsed once per session in
+# the simple_catalog fixture rather than assembled field-by-field.
+_CATALOG_TEXT = """
+table {
+  name: 'TestTable'
+  column { name: 'column_str' type { type_kind: TYPE_STRING } }
+  column { name: 'column_bool' type { type_kind: TYPE_BOOL } }
+  column { name: 'column_int' type { type_kind: TYPE_INT64 } }
+}
+"""
+
+
+def pytest_sessionstart(session):
+    """Resolve the WASM binary once for the whole session."""
     # Try optimized version first, fall back to regular version
     opt_path = os.path.join(PROJECT_ROOT, "build", "zetasql.opt.wasm")
     regular_path = os.path.join(PROJECT_ROOT, "build", "zetasql.wasm")
-    
+
     if os.path.exists(opt_path):
-        path = opt_path
+        session.config._wasm_path = opt_path
     elif os.path.exists(regular_path):
-        path = regular_path
+        session.config._wasm_path = regular_path
     else:
-        pytest.skip(f"WASM binary not found")
-    
-    return path
+        session.config._wasm_path = None
+
+    if session.config._wasm_path is not None:
+        print(f"[DEBUG] Using WASM binary: {session.config._wasm_path}", file=sys.stderr)
 
 
 @pytest.fixture(scope="session")
-def analyzer_options():
-    """Create default analyzer options with all language features enabled."""
-    
+def wasm_path(request):
+    """Path to the WASM binary resolved at session start."""
+    path = request.config._wasm_path
+    if path is None:
+        pytest.skip("WASM binary not found")
+    return path
+
+
+def _build_analyzer_options():
+    """Build default analyzer options with all language features enabled."""
+
     # Create a PrepareRequest to access AnalyzerOptionsProto
     request = local_service_pb2.PrepareRequest()
     options = request.options
-    
+
     # Enable all language features to support builtin functions
     # This enables features like arithmetic operators ($add, $subtract, etc.),
     # string functions (UPPER, LOWER, CONCAT), and numeric functions (ABS, CEIL, FLOOR)
     language_options = options.language_options
     language_options.name_resolution_mode = options_pb2.NAME_RESOLUTION_DEFAULT
     language_options.product_mode = options_pb2.PRODUCT_INTERNAL
-    
+
     # Enable all released language features
     # Note: In production, you should enable only the specific features you need
     # For testing purposes, we enable all features to test maximum functionality
     # This is equivalent to calling EnableMaximumLanguageFeatures() in C++
     # EXCEPT: FEATURE_SPANNER_LEGACY_DDL which causes "Spanner DDL statements are not supported" error
-    for feature in dir(options_pb2):
-        if feature.startswith('FEATURE_'):
-            # Skip Spanner-specific DDL feature that causes errors
-            if feature == 'FEATURE_SPANNER_LEGACY_DDL':
-                continue
-            try:
-                feature_value = getattr(options_pb2, feature)
-                if isinstance(feature_value, int) and feature_value > 0:
-                    language_options.enabled_language_features.append(feature_value)
-            except:
-                pass
-    
+    # (FEATURE_SPANNER_LEGACY_DDL is the Spanner-specific DDL feature that causes errors)
+    language_options.enabled_language_features.extend(
+        value.number
+        for value in options_pb2.LanguageFeature.DESCRIPTOR.values
+        if value.number > 0 and value.name != 'FEATURE_SPANNER_LEGACY_DDL'
+    )
+
+    return options
+
+
+# Computed once at conftest import; the fixtures below just hand these out
+# so every worker process pays the construction cost a single time.
+_ANALYZER_OPTIONS = _build_analyzer_options()
+_ANALYZER_OPTIONS_BYTES = _ANALYZER_OPTIONS.SerializeToString()
+_LANGUAGE_OPTIONS_BYTES = _ANALYZER_OPTIONS.language_options.SerializeToString()
+
+# Empty catalog with builtin functions enabled - the common catalog for
+# prepared expressions and queries that do not reference tables.
+_BUILTIN_ONLY_CATALOG = simple_catalog_pb2.SimpleCatalogProto()
+_BUILTIN_ONLY_CATALOG.builtin_function_options.language_options.CopyFrom(
+    _ANALYZER_OPTIONS.language_options)
+_BUILTIN_ONLY_CATALOG_BYTES = _BUILTIN_ONLY_CATALOG.SerializeToString()
+
+
+@pytest.fixture(scope="session")
+def analyzer_options():
+    """Default analyzer options with all language features enabled."""
+    return _ANALYZER_OPTIONS
+
+
+@pytest.fixture(scope="session")
+def analyzer_options_minimal():
+    """Create analyzer options without the full language-feature sweep.
+
+    The default analyzer_options enables every released feature, which
+    adds hundreds of repeated int32 entries to each request that must be
+    serialized and copied across the WASM boundary. Tests that only
+    exercise plain literals (no builtin functions) can use this trimmed
+    variant instead.
+    """
+    request = local_service_pb2.PrepareRequest()
+    options = request.options
+
+    language_options = options.language_options
+    language_options.name_resolution_mode = options_pb2.NAME_RESOLUTION_DEFAULT
+    language_options.product_mode = options_pb2.PRODUCT_INTERNAL
+
     return options
 
 
+@pytest.fixture(scope="session")
+def analyzer_options_bytes():
+    """Serialized analyzer options, shared so requests can parse the bytes
+    once instead of re-copying the large options message per test."""
+    return _ANALYZER_OPTIONS_BYTES
+
+
+@pytest.fixture(scope="session")
+def language_options_bytes():
+    """Serialized language options, shared by every site that fills in
+    builtin_function_options instead of re-copying the large message."""
+    return _LANGUAGE_OPTIONS_BYTES
+
+
+@pytest.fixture(scope="session")
+def parse_request_bytes():
+    """Pre-serialized ParseRequests for every PARSE_STATEMENTS sample."""
+    return {
+        name: local_service_pb2.ParseRequest(sql_statement=sql).SerializeToString()
+        for name, sql in PARSE_STATEMENTS.items()
+    }
+
+
+@pytest.fixture(scope="session")
+def analyze_bytes_simple_select():
+    """Pre-serialized AnalyzeRequest for the fixed 'SELECT 1 AS one' statement."""
+    request = local_service_pb2.AnalyzeRequest(sql_statement="SELECT 1 AS one")
+    return request.SerializeToString()
+
+
+@pytest.fixture(scope="session")
+def builtin_catalog():
+    """Serialized empty catalog with builtin functions enabled.
+
+    Tests that only need builtin functions parse these bytes into the
+    request instead of rebuilding the catalog and re-copying the large
+    language_options message each time.
+    """
+    return _BUILTIN_ONLY_CATALOG_BYTES
+
+
 @pytest.fixture(scope="session")
 def wasm_client(wasm_path):
-    """Create a shared WASM client for all tests."""
+    """Create a shared WASM client for all tests.
+
+    Module compilation and instantiation dominate startup, so the client
+    (store, instance, and exports) is built exactly once per session.
+    The only cross-test state inside the guest is the prepared
+    expression/query/modify table, which tests manage via the matching
+    Unprepare RPCs; tests must not assume a freshly instantiated module.
+    """
     return WasmClient(wasm_path)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def simple_catalog():
-    """Create a simple catalog with test table."""
-    
+    """Create a simple catalog with test table.
+
+    Session-scoped template: tests that need to mutate the catalog should
+    use the `fresh_catalog` fixture instead of modifying this instance.
+    """
+    return text_format.Parse(_CATALOG_TEXT,
+                             simple_catalog_pb2.SimpleCatalogProto())
+
+
+@pytest.fixture(scope="session")
+def simple_catalog_with_builtins(simple_catalog, language_options_bytes):
+    """Serialized test-table catalog with builtin functions enabled.
+
+    Tests that read the catalog (analysis, query preparation) parse these
+    bytes into the request instead of copying the template and re-attaching
+    builtin_function_options per test.
+    """
     catalog = simple_catalog_pb2.SimpleCatalogProto()
-    
-    # Add a test table
-    table = catalog.table.add()
-    table.name = "TestTable"
-    
-    # Add columns with correct type constants
-    col1 = table.column.add()
-    col1.name = "column_str"
-    col1.type.type_kind = type_pb2.TYPE_STRING
-    
-    col2 = table.column.add()
-    col2.name = "column_bool"
-    col2.type.type_kind = type_pb2.TYPE_BOOL
-    
-    col3 = table.column.add()
-    col3.name = "column_int"
-    col3.type.type_kind = type_pb2.TYPE_INT64
-    
-    return catalog
+    catalog.CopyFrom(simple_catalog)
+    catalog.builtin_function_options.language_options.MergeFromString(
+        language_options_bytes)
+    return catalog.SerializeToString()
+
+
+@pytest.fixture(scope="session")
+def attach_catalog(simple_catalog_with_builtins):
+    """Attach the shared test-table catalog (with builtins) to a request.
+
+    Merging the pre-serialized bytes is a single protobuf-runtime parse
+    instead of the recursive CopyFrom traversal plus per-test
+    builtin_function_options rebuild that each call site used to do.
+    """
+
+    def attach(request):
+        request.simple_catalog.MergeFromString(simple_catalog_with_builtins)
+
+    return attach
 
 
 @pytest.fixture
+def fresh_catalog(simple_catalog):
+    """Return a mutable per-test copy of the session-scoped catalog template."""
+    out = simple_catalog_pb2.SimpleCatalogProto()
+    out.CopyFrom(simple_catalog)
+    return out
+
+
+@pytest.fixture(scope="session")
 def table_data():
     """Create sample table data."""
     
-    rows = []
-    
-    # Row 1: ['string_1', True, 123]
-    row1 = []
-    v1 = value_pb2.ValueProto()
-    v1.string_value = "string_1"
-    row1.append(v1)
-    
-    v2 = value_pb2.ValueProto()
-    v2.bool_value = True
-    row1.append(v2)
-    
-    v3 = value_pb2.ValueProto()
-    v3.int32_value = 123
-    row1.append(v3)
-    
-    rows.append(row1)
-    
-    # Row 2: ['string_2', True, 321]
-    row2 = []
-    v1 = value_pb2.ValueProto()
-    v1.string_value = "string_2"
-    row2.append(v1)
-    
-    v2 = value_pb2.ValueProto()
-    v2.bool_value = True
-    row2.append(v2)
-    
-    v3 = value_pb2.ValueProto()
-    v3.int32_value = 321
-    row2.append(v3)
-    
-    rows.append(row2)
-    
-    return rows
+    return [
+        # Row 1: ['string_1', True, 123]
+        [
+            value_pb2.ValueProto(string_value="string_1"),
+            value_pb2.ValueProto(bool_value=True),
+            value_pb2.ValueProto(int32_value=123),
+        ],
+        # Row 2: ['string_2', True, 321]
+        [
+            value_pb2.ValueProto(string_value="string_2"),
+            value_pb2.ValueProto(bool_value=True),
+            value_pb2.ValueProto(int32_value=321),
+        ],
+    ]
 
 
-@pytest.fixture
-def prepare_expression_request(analyzer_options):
+def _cell_value(cell):
+    """Build a ValueProto for a plain Python cell value."""
+    # bool first: bool is an int subclass and must not hit the int64 branch
+    if isinstance(cell, bool):
+        return value_pb2.ValueProto(bool_value=cell)
+    if isinstance(cell, int):
+        return value_pb2.ValueProto(int64_value=cell)
+    if isinstance(cell, float):
+        return value_pb2.ValueProto(double_value=cell)
+    return value_pb2.ValueProto(string_value=cell)
+
+
+@pytest.fixture(scope="session")
+def build_table_content():
+    """Bulk-seed a table_content entry from plain Python rows.
+
+    Builds every cell of a row up front and appends them with a single
+    extend() instead of one cell.add() plus one attribute write per cell,
+    which keeps the Python-to-proto crossings per row constant as tables
+    get wider.
+    """
+
+    def build(table_content, rows):
+        for row in rows:
+            table_content.table_data.row.add().cell.extend(
+                [_cell_value(cell) for cell in row])
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def prepare_expression_request():
     """Create a PrepareExpression request factory with builtin functions enabled."""
-    
+
     def factory(sql: str):
         request = local_service_pb2.PrepareRequest()
         request.sql = sql
-        request.options.CopyFrom(analyzer_options)
-        
-        # Create a simple catalog with builtin functions enabled
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        # Include all builtin functions
-        builtin_opts.include_function_ids.extend([])  # Empty means include all
-        
-        request.simple_catalog.CopyFrom(catalog)
+        request.options.MergeFromString(_ANALYZER_OPTIONS_BYTES)
+        # Attach the precomputed builtin-only catalog (empty
+        # include_function_ids means include all builtin functions)
+        request.simple_catalog.ParseFromString(_BUILTIN_ONLY_CATALOG_BYTES)
         return request
-    
+
     return factory
 
 
-@pytest.fixture
-def prepare_query_request(analyzer_options):
+@pytest.fixture(scope="session")
+def prepare_query_request():
     """Create a PrepareQuery request factory with builtin functions enabled."""
-    
+
     def factory(sql: str, catalog=None):
         request = local_service_pb2.PrepareQueryRequest()
         request.sql = sql
-        request.options.CopyFrom(analyzer_options)
-        
-        # If a specific catalog with tables is provided, use it
-        if catalog:
-            # Create a copy and ensure it has builtin_function_options
-            catalog_copy = simple_catalog_pb2.SimpleCatalogProto()
-            catalog_copy.CopyFrom(catalog)
-            # Always set builtin_function_options
-            builtin_opts = catalog_copy.builtin_function_options
-            builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-            request.simple_catalog.CopyFrom(catalog_copy)
+        request.options.MergeFromString(_ANALYZER_OPTIONS_BYTES)
+
+        # Pre-serialized catalogs (e.g. simple_catalog_with_builtins) merge
+        # straight in, skipping the encode step entirely; a catalog message
+        # is copied into the request and gets builtin options attached.
+        if isinstance(catalog, bytes):
+            request.simple_catalog.MergeFromString(catalog)
+        elif catalog:
+            request.simple_catalog.CopyFrom(catalog)
+            # Always set builtin_function_options so builtin functions resolve
+            builtin_opts = request.simple_catalog.builtin_function_options
+            builtin_opts.language_options.MergeFromString(_LANGUAGE_OPTIONS_BYTES)
         else:
-            # Create a simple catalog with builtin functions enabled
-            new_catalog = simple_catalog_pb2.SimpleCatalogProto()
-            builtin_opts = new_catalog.builtin_function_options
-            builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-            request.simple_catalog.CopyFrom(new_catalog)
-        
+            request.simple_catalog.ParseFromString(_BUILTIN_ONLY_CATALOG_BYTES)
+
         return request
-    
+
     return factory
 
 
-@pytest.fixture
+# Pre-serialized PrepareRequest template (full options + builtin-only
+# catalog, no sql) for the parameterized-expression tests: cloning these
+# bytes and patching sql plus one parameter is much cheaper than building
+# the request field-by-field per test.
+_PARAM_PREPARE_TEMPLATE = local_service_pb2.PrepareRequest()
+_PARAM_PREPARE_TEMPLATE.options.MergeFromString(_ANALYZER_OPTIONS_BYTES)
+_PARAM_PREPARE_TEMPLATE.simple_catalog.ParseFromString(_BUILTIN_ONLY_CATALOG_BYTES)
+_PARAM_PREPARE_TEMPLATE_BYTES = _PARAM_PREPARE_TEMPLATE.SerializeToString()
+
+
+@pytest.fixture(scope="session")
+def make_param_request():
+    """Factory for PrepareRequests with a single typed query parameter."""
+
+    def factory(sql: str, param_name: str, type_kind):
+        request = local_service_pb2.PrepareRequest()
+        request.MergeFromString(_PARAM_PREPARE_TEMPLATE_BYTES)
+        request.sql = sql
+        param = request.options.query_parameters.add()
+        param.name = param_name
+        param.type.type_kind = type_kind
+        return request
+
+    return factory
+
+
+# SQL containing these markers is re-prepared per call rather than cached:
+# reusing one prepared id across tests is only safe for deterministic input.
+_NON_DETERMINISTIC_MARKERS = ("RAND", "CURRENT_")
+
+
+class PreparedExpressionCache:
+    """Session-wide cache of prepared expression ids keyed by SQL text.
+
+    Deterministic expressions like "1 + 2" are prepared once and the id is
+    reused by every test that asks for them - including samples shared
+    between suites, which skip the Prepare RPC entirely on the second
+    request. All prepared ids are unprepared in bulk when the session
+    ends, so callers must not unprepare cached ids themselves.
+    Non-deterministic SQL (RAND, CURRENT_*) bypasses the cache and is
+    prepared fresh on each call.
+    """
+
+    def __init__(self, wasm_client, make_request):
+        self._client = wasm_client
+        self._make_request = make_request
+        self._cache = {}
+        self._prepared_ids = []
+
+    @staticmethod
+    def _cacheable(sql):
+        upper = sql.upper()
+        return not any(marker in upper for marker in _NON_DETERMINISTIC_MARKERS)
+
+    def get(self, sql):
+        """Prepared id for one SQL string, preparing it on a cache miss."""
+        if self._cacheable(sql) and sql in self._cache:
+            return self._cache[sql]
+        response = self._client.prepare_expression(self._make_request(sql))
+        prepared_id = response.prepared.prepared_expression_id
+        self._prepared_ids.append(prepared_id)
+        if self._cacheable(sql):
+            self._cache[sql] = prepared_id
+        return prepared_id
+
+    def get_many(self, sqls):
+        """Prepared ids for a batch of SQL strings, in input order.
+
+        Cache misses are submitted together through the batched
+        prepare_expressions path; hits never reach the guest.
+        """
+        sqls = list(sqls)
+        results = [None] * len(sqls)
+        missing = []
+        for i, sql in enumerate(sqls):
+            if self._cacheable(sql) and sql in self._cache:
+                results[i] = self._cache[sql]
+            else:
+                missing.append(i)
+        if missing:
+            responses = self._client.prepare_expressions(
+                [self._make_request(sqls[i]) for i in missing])
+            for i, response in zip(missing, responses):
+                prepared_id = response.prepared.prepared_expression_id
+                self._prepared_ids.append(prepared_id)
+                results[i] = prepared_id
+                if self._cacheable(sqls[i]):
+                    self._cache[sqls[i]] = prepared_id
+        return results
+
+    def track(self, prepared_id):
+        """Register an externally prepared id for bulk unprepare at drain.
+
+        Lets tests that build their own PrepareRequest (e.g. with query
+        parameters) skip the per-test Unprepare round trip.
+        """
+        self._prepared_ids.append(prepared_id)
+        return prepared_id
+
+    def drain(self):
+        """Unprepare every id this cache created (session teardown)."""
+        for prepared_id in self._prepared_ids:
+            unprepare_req = local_service_pb2.UnprepareRequest()
+            unprepare_req.prepared_expression_id = prepared_id
+            self._client.unprepare_expression(unprepare_req)
+        self._prepared_ids.clear()
+        self._cache.clear()
+
+
+@pytest.fixture(scope="session")
+def prepared_expression_cache(wasm_client, prepare_expression_request):
+    """Shared PreparedExpressionCache, drained at session teardown."""
+    cache = PreparedExpressionCache(wasm_client, prepare_expression_request)
+    yield cache
+    cache.drain()
+
+
+class PreparedQueryCache:
+    """Session-wide cache of prepared query ids keyed by SQL and catalog.
+
+    The prepare-only query tests each analyze a distinct SQL string, but
+    across runs and suites the same (sql, catalog) pair recurs; the cache
+    keeps one prepared_query_id per pair so repeats cost a dict lookup
+    instead of a PrepareQuery round trip. All ids are unprepared in bulk
+    at session teardown, so callers must not unprepare cached ids
+    themselves.
+    """
+
+    def __init__(self, wasm_client, make_request):
+        self._client = wasm_client
+        self._make_request = make_request
+        self._cache = {}
+        self._prepared_ids = []
+
+    @staticmethod
+    def _catalog_key(catalog):
+        if catalog is None:
+            return b""
+        if isinstance(catalog, bytes):
+            return catalog
+        return catalog.SerializeToString()
+
+    def get(self, sql, catalog=None):
+        """Prepared query id for (sql, catalog), preparing on a miss.
+
+        `catalog` may be a SimpleCatalogProto or its pre-serialized bytes;
+        passing bytes avoids re-serializing the catalog per lookup.
+        """
+        key = (sql, self._catalog_key(catalog))
+        prepared_id = self._cache.get(key)
+        if prepared_id is None:
+            response = self._client.prepare_query(self._make_request(sql, catalog))
+            prepared_id = response.prepared.prepared_query_id
+            self._prepared_ids.append(prepared_id)
+            self._cache[key] = prepared_id
+        return prepared_id
+
+    def warm_up(self, sqls, catalog=None):
+        """Prepare a batch of statements back to back, filling the cache.
+
+        The options/catalog submessages are built once for the batch;
+        between guest calls only the sql field is rewritten before
+        re-serializing, so each extra statement costs one field write plus
+        the RPC instead of a full request build. Statements already cached
+        are skipped, and later get() calls for warmed statements are pure
+        dict hits.
+        """
+        catalog_key = self._catalog_key(catalog)
+        request = None
+        for sql in sqls:
+            key = (sql, catalog_key)
+            if key in self._cache:
+                continue
+            if request is None:
+                request = self._make_request(sql, catalog)
+            else:
+                request.sql = sql
+            response = self._client.prepare_query(request)
+            prepared_id = response.prepared.prepared_query_id
+            self._prepared_ids.append(prepared_id)
+            self._cache[key] = prepared_id
+
+    def drain(self):
+        """Unprepare every id this cache created (session teardown)."""
+        for prepared_id in self._prepared_ids:
+            unprepare_req = local_service_pb2.UnprepareQueryRequest()
+            unprepare_req.prepared_query_id = prepared_id
+            self._client.unprepare_query(unprepare_req)
+        self._prepared_ids.clear()
+        self._cache.clear()
+
+
+@pytest.fixture(scope="session")
+def prepared_query_cache(wasm_client, prepare_query_request):
+    """Shared PreparedQueryCache, drained at session teardown."""
+    cache = PreparedQueryCache(wasm_client, prepare_query_request)
+    yield cache
+    cache.drain()
+
+
+@pytest.fixture(scope="session")
 def evaluate_request():
     """Create an Evaluate request factory."""
-    
+
     def factory(prepared_id: int):
         request = local_service_pb2.EvaluateRequest()
         request.prepared_expression_id = prepared_id
         return request
-    
+
     return factory
+
+
+@pytest.fixture(scope="session")
+def proto_pool():
+    """Preallocated request messages, recycled with Clear() between uses.
+
+    Keyed by message class; callers clear before filling, so each type
+    pays its descriptor-pool lookup and allocation once per session.
+    """
+    return {
+        cls: cls() for cls in (
+            local_service_pb2.PrepareQueryRequest,
+            local_service_pb2.EvaluateQueryRequest,
+            local_service_pb2.UnprepareQueryRequest,
+        )
+    }
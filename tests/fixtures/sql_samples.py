@@ -88,6 +88,13 @@ ERROR_CASES = {
     "division_by_zero": "SELECT 1 / 0",
 }
 
+# Parse test statements
+PARSE_STATEMENTS = {
+    "simple_query": "SELECT 1 AS one",
+    "complex_query": "SELECT a, b FROM table1 WHERE a > 10 ORDER BY b",
+    "join_query": "SELECT t1.a, t2.b FROM table1 t1 JOIN table2 t2 ON t1.id = t2.id",
+}
+
 # Format test cases
 FORMAT_TEST_CASES = {
     "messy_query": "seLect   foo,bar from some_table where   something  limit 10",
@@ -104,6 +111,11 @@ EXTRACT_TABLE_CASES = {
     "qualified_name": "SELECT * FROM mydb.myschema.users",
 }
 
+# Precomputed item tuples for @pytest.mark.parametrize, so collection
+# reuses one tuple instead of re-walking the dicts
+FORMAT_TEST_CASES_ITEMS = tuple(FORMAT_TEST_CASES.items())
+EXTRACT_TABLE_CASES_ITEMS = tuple(EXTRACT_TABLE_CASES.items())
+
 # Analysis test cases
 ANALYZE_CASES = {
     "simple_select": "SELECT 1 AS one",
@@ -6,46 +6,23 @@ Tests for Analyze, Parse, and BuildSql RPC methods.
 
 import pytest
 from wasm_client import ZetaSQLError
+from fixtures.sql_samples import PARSE_STATEMENTS
 from zetasql.local_service import local_service_pb2
-from zetasql.proto import simple_catalog_pb2
 
 
 class TestParseMethod:
     """Test the Parse RPC method."""
     
-    def test_parse_simple_query(self, wasm_client):
-        """Test parsing a simple query."""
-        
-        request = local_service_pb2.ParseRequest()
-        request.sql_statement = "SELECT 1 AS one"
-        
-        response = wasm_client.parse(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.HasField("parsed_statement")
-    
-    def test_parse_complex_query(self, wasm_client):
-        """Test parsing a complex query."""
-        
-        request = local_service_pb2.ParseRequest()
-        request.sql_statement = "SELECT a, b FROM table1 WHERE a > 10 ORDER BY b"
-        
-        response = wasm_client.parse(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.HasField("parsed_statement")
-    
-    def test_parse_join_query(self, wasm_client):
-        """Test parsing a query with JOIN."""
-        
-        request = local_service_pb2.ParseRequest()
-        request.sql_statement = "SELECT t1.a, t2.b FROM table1 t1 JOIN table2 t2 ON t1.id = t2.id"
-        
-        response = wasm_client.parse(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.HasField("parsed_statement")
-    
+    @pytest.mark.parametrize("name", PARSE_STATEMENTS)
+    def test_parse_statements(self, wasm_client, parse_request_bytes, name):
+        """Test parsing various statements."""
+
+        response = wasm_client.parse_bytes(parse_request_bytes[name])
+
+        # Response validated (errors raise RuntimeError in wasm_client);
+        # ByteSize avoids the presence-tracking path in the parametrized sweep
+        assert response.parsed_statement.ByteSize() > 0
+
     def test_parse_syntax_error(self, wasm_client):
         """Test parsing invalid SQL."""
         
@@ -60,29 +37,23 @@ class TestParseMethod:
 class TestAnalyzeMethod:
     """Test the Analyze RPC method."""
     
-    def test_analyze_simple_select(self, wasm_client):
+    def test_analyze_simple_select(self, wasm_client, analyze_bytes_simple_select):
         """Test analyzing a simple SELECT statement."""
-        
-        request = local_service_pb2.AnalyzeRequest()
-        request.sql_statement = "SELECT 1 AS one"
-        
-        response = wasm_client.analyze(request)
+
+        response = wasm_client.analyze_bytes(analyze_bytes_simple_select)
         
         # Response validated (errors raise RuntimeError in wasm_client), \
         assert response.HasField("resolved_statement")
     
-    def test_analyze_with_function(self, wasm_client, analyzer_options):
+    def test_analyze_with_function(self, wasm_client, analyzer_options_bytes, builtin_catalog):
         """Test analyzing statement with function call."""
-        
+
         request = local_service_pb2.AnalyzeRequest()
         request.sql_statement = "SELECT UPPER('hello') AS upper_text"
-        request.options.CopyFrom(analyzer_options)
-        
-        # Create catalog with builtin functions
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        request.simple_catalog.CopyFrom(catalog)
+        request.options.MergeFromString(analyzer_options_bytes)
+
+        # Attach the shared catalog with builtin functions
+        request.simple_catalog.ParseFromString(builtin_catalog)
         
         response = wasm_client.analyze(request)
         
@@ -101,36 +72,30 @@ class TestAnalyzeMethod:
         # Response validated (errors raise RuntimeError in wasm_client)
         assert response.HasField("resolved_statement")
     
-    def test_analyze_aggregate(self, wasm_client, simple_catalog, analyzer_options):
+    def test_analyze_aggregate(self, wasm_client, analyzer_options_bytes, simple_catalog_with_builtins):
         """Test analyzing aggregation query."""
-        
+
         request = local_service_pb2.AnalyzeRequest()
         request.sql_statement = "SELECT COUNT(*) AS total FROM TestTable"
-        request.options.CopyFrom(analyzer_options)
-        
-        # Ensure simple_catalog has builtin functions
-        if not simple_catalog.HasField('builtin_function_options'):
-            builtin_opts = simple_catalog.builtin_function_options
-            builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        request.simple_catalog.CopyFrom(simple_catalog)
+        request.options.MergeFromString(analyzer_options_bytes)
+
+        # Attach the shared test-table catalog with builtin functions
+        request.simple_catalog.ParseFromString(simple_catalog_with_builtins)
         
         response = wasm_client.analyze(request)
         
         # Response validated (errors raise RuntimeError in wasm_client)
         assert response.HasField("resolved_statement")
     
-    def test_analyze_expression(self, wasm_client, analyzer_options):
+    def test_analyze_expression(self, wasm_client, analyzer_options_bytes, builtin_catalog):
         """Test analyzing an expression."""
-        
+
         request = local_service_pb2.AnalyzeRequest()
         request.sql_expression = "1 + 2"
-        request.options.CopyFrom(analyzer_options)
-        
-        # Create catalog with builtin functions
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        request.simple_catalog.CopyFrom(catalog)
+        request.options.MergeFromString(analyzer_options_bytes)
+
+        # Attach the shared catalog with builtin functions
+        request.simple_catalog.ParseFromString(builtin_catalog)
         
         response = wasm_client.analyze(request)
         
@@ -150,13 +115,11 @@ class TestAnalyzeMethod:
 class TestBuildSqlMethod:
     """Test the BuildSql RPC method."""
     
-    def test_build_sql_from_analyzed(self, wasm_client):
+    def test_build_sql_from_analyzed(self, wasm_client, analyze_bytes_simple_select):
         """Test building SQL from resolved AST."""
-        
+
         # First analyze
-        analyze_req = local_service_pb2.AnalyzeRequest()
-        analyze_req.sql_statement = "SELECT 1 AS one"
-        analyze_resp = wasm_client.analyze(analyze_req)
+        analyze_resp = wasm_client.analyze_bytes(analyze_bytes_simple_select)
         
         
         # Then build SQL back
@@ -170,7 +133,7 @@ class TestBuildSqlMethod:
 class TestAnalyzeParseRoundtrip:
     """Test combinations of Parse and Analyze."""
     
-    def test_parse_then_analyze(self, wasm_client, analyzer_options):
+    def test_parse_then_analyze(self, wasm_client, analyzer_options_bytes, builtin_catalog):
         """Test parsing then analyzing the same SQL."""
         
         sql = "SELECT UPPER('test') AS upper_text"
@@ -184,12 +147,9 @@ class TestAnalyzeParseRoundtrip:
         # Analyze
         analyze_req = local_service_pb2.AnalyzeRequest()
         analyze_req.sql_statement = sql
-        analyze_req.options.CopyFrom(analyzer_options)
+        analyze_req.options.MergeFromString(analyzer_options_bytes)
         
-        # Create catalog with builtin functions
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        analyze_req.simple_catalog.CopyFrom(catalog)
+        # Attach the shared catalog with builtin functions
+        analyze_req.simple_catalog.ParseFromString(builtin_catalog)
         analyze_resp = wasm_client.analyze(analyze_req)
         
@@ -13,7 +13,6 @@ from fixtures.sql_samples import (
     CONDITIONAL_EXPRESSIONS,
 )
 from zetasql.local_service import local_service_pb2
-from zetasql.proto import simple_catalog_pb2
 from zetasql.public import type_pb2
 
 
@@ -56,41 +55,39 @@ class TestBasicExpressions:
 
 class TestStringFunctions:
     """Test string function evaluation."""
-    
-    @pytest.mark.parametrize("name,sql", STRING_FUNCTIONS.items())
-    def test_string_functions(self, wasm_client, prepare_expression_request, name, sql):
-        """Test various string functions."""
-        request = prepare_expression_request(sql)
-        response = wasm_client.prepare_expression(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client), \
-        assert response.prepared.prepared_expression_id >= 0
+
+    def test_string_functions(self, prepared_expression_cache):
+        """Test all string function samples in one batched submission."""
+        prepared_ids = prepared_expression_cache.get_many(STRING_FUNCTIONS.values())
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        for name, prepared_id in zip(STRING_FUNCTIONS, prepared_ids):
+            assert prepared_id >= 0, name
 
 
 class TestNumericFunctions:
     """Test numeric function evaluation."""
-    
-    @pytest.mark.parametrize("name,sql", NUMERIC_FUNCTIONS.items())
-    def test_numeric_functions(self, wasm_client, prepare_expression_request, name, sql):
-        """Test various numeric functions."""
-        request = prepare_expression_request(sql)
-        response = wasm_client.prepare_expression(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client), \
-        assert response.prepared.prepared_expression_id >= 0
+
+    def test_numeric_functions(self, prepared_expression_cache):
+        """Test all numeric function samples in one batched submission."""
+        prepared_ids = prepared_expression_cache.get_many(NUMERIC_FUNCTIONS.values())
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        for name, prepared_id in zip(NUMERIC_FUNCTIONS, prepared_ids):
+            assert prepared_id >= 0, name
 
 
 class TestConditionalExpressions:
     """Test conditional expressions (IF, CASE, etc.)."""
-    
-    @pytest.mark.parametrize("name,sql", CONDITIONAL_EXPRESSIONS.items())
-    def test_conditional_expressions(self, wasm_client, prepare_expression_request, name, sql):
-        """Test conditional expressions."""
-        request = prepare_expression_request(sql)
-        response = wasm_client.prepare_expression(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client), \
-        assert response.prepared.prepared_expression_id >= 0
+
+    def test_conditional_expressions(self, prepared_expression_cache):
+        """Test all conditional expression samples in one batched submission."""
+        prepared_ids = prepared_expression_cache.get_many(
+            CONDITIONAL_EXPRESSIONS.values())
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        for name, prepared_id in zip(CONDITIONAL_EXPRESSIONS, prepared_ids):
+            assert prepared_id >= 0, name
 
 
 class TestRandomFunction:
@@ -104,21 +101,17 @@ class TestRandomFunction:
         assert response.prepared.prepared_expression_id >= 0
         assert response.prepared.HasField('output_type')
     
-    def test_rand_execute(self, wasm_client, prepare_expression_request):
+    def test_rand_execute(self, wasm_client, prepared_expression_cache):
         """Test that RAND() can be executed and returns valid values."""
         
-        # Prepare RAND()
-        prepare_req = prepare_expression_request("RAND()")
-        prepare_resp = wasm_client.prepare_expression(prepare_req)
-        prepared_id = prepare_resp.prepared.prepared_expression_id
+        # Prepare RAND() (uncached; unprepared in bulk at session teardown)
+        prepared_id = prepared_expression_cache.get("RAND()")
         
-        # Evaluate multiple times to check randomness
+        # Evaluate multiple times in one batched call to check randomness
+        responses = wasm_client.evaluate_expression_batch(prepared_id, 5)
+
         values = []
-        for _ in range(5):
-            eval_req = local_service_pb2.EvaluateRequest()
-            eval_req.prepared_expression_id = prepared_id
-            eval_resp = wasm_client.evaluate_expression(eval_req)
-            
+        for eval_resp in responses:
             # RAND() should return a value (we can't check exact value as it's random)
             assert eval_resp.HasField('value')
             # Store value for uniqueness check
@@ -128,20 +121,15 @@ class TestRandomFunction:
         # At least some values should be different (probabilistically almost certain)
         # RAND() returns values in [0, 1), so they should be floats
         assert len(values) > 0, "RAND() should return double values"
-        assert all(0 <= v < 1 for v in values), "RAND() values should be in [0, 1)"
-        
-        # Clean up
-        unprepare_req = local_service_pb2.UnprepareRequest()
-        unprepare_req.prepared_expression_id = prepared_id
-        wasm_client.unprepare_expression(unprepare_req)
+        # Two C-level min/max scans instead of a per-element generator
+        assert 0 <= min(values) and max(values) < 1, \
+            "RAND() values should be in [0, 1)"
     
-    def test_rand_in_expression(self, wasm_client, prepare_expression_request):
+    def test_rand_in_expression(self, wasm_client, prepared_expression_cache):
         """Test RAND() in arithmetic expressions."""
         
-        # Test RAND() * 100 (scale to 0-100 range)
-        prepare_req = prepare_expression_request("RAND() * 100")
-        prepare_resp = wasm_client.prepare_expression(prepare_req)
-        prepared_id = prepare_resp.prepared.prepared_expression_id
+        # Test RAND() * 100 (scale to 0-100 range; unprepared at teardown)
+        prepared_id = prepared_expression_cache.get("RAND() * 100")
         
         # Evaluate
         eval_req = local_service_pb2.EvaluateRequest()
@@ -153,11 +141,6 @@ class TestRandomFunction:
         if eval_resp.value.HasField('double_value'):
             value = eval_resp.value.double_value
             assert 0 <= value < 100, f"RAND() * 100 should be in [0, 100), got {value}"
-        
-        # Clean up
-        unprepare_req = local_service_pb2.UnprepareRequest()
-        unprepare_req.prepared_expression_id = prepared_id
-        wasm_client.unprepare_expression(unprepare_req)
 
 
 class TestPrepareEvaluateWorkflow:
@@ -185,51 +168,35 @@ class TestPrepareEvaluateWorkflow:
         unprepare_resp = wasm_client.unprepare_expression(unprepare_req)
         
     
-    def test_multiple_evaluations(self, wasm_client, prepare_expression_request):
+    def test_multiple_evaluations(self, wasm_client, prepared_expression_cache):
         """Test evaluating the same prepared expression multiple times."""
-        
-        # Prepare once
-        prepare_req = prepare_expression_request("1 + 2")
-        prepare_resp = wasm_client.prepare_expression(prepare_req)
-        prepared_id = prepare_resp.prepared.prepared_expression_id
-        
+
+        # Prepare once (cached across the session; unprepared at teardown)
+        prepared_id = prepared_expression_cache.get("1 + 2")
+
+        # Serialize the request once and reuse the bytes for every call
+        eval_req = local_service_pb2.EvaluateRequest()
+        eval_req.prepared_expression_id = prepared_id
+        eval_payload = eval_req.SerializeToString()
+
         # Evaluate multiple times
         for _ in range(3):
-            eval_req = local_service_pb2.EvaluateRequest()
-            eval_req.prepared_expression_id = prepared_id
-            eval_resp = wasm_client.evaluate_expression(eval_req)
-        
-        # Clean up
-        unprepare_req = local_service_pb2.UnprepareRequest()
-        unprepare_req.prepared_expression_id = prepared_id
-        wasm_client.unprepare_expression(unprepare_req)
+            eval_resp = wasm_client.evaluate_bytes(eval_payload)
 
 
 class TestParameterizedExpressions:
     """Test expressions with parameters."""
     
-    def test_integer_parameter(self, wasm_client, analyzer_options):
+    def test_integer_parameter(self, wasm_client, make_param_request, prepared_expression_cache):
         """Test expression with integer parameter."""
-        
-        # Prepare with parameter
-        prepare_req = local_service_pb2.PrepareRequest()
-        prepare_req.sql = "@value"
-        prepare_req.options.CopyFrom(analyzer_options)
-        
-        # Create catalog with builtin functions
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        prepare_req.simple_catalog.CopyFrom(catalog)
-        
-        # Define parameter type
-        param = prepare_req.options.query_parameters.add()
-        param.name = "value"
-        param.type.type_kind = type_pb2.TYPE_INT64
-        
+
+        # Prepare with parameter (cloned from the shared request template)
+        prepare_req = make_param_request("@value", "value", type_pb2.TYPE_INT64)
         prepare_resp = wasm_client.prepare_expression(prepare_req)
         
-        prepared_id = prepare_resp.prepared.prepared_expression_id
+        # Track for bulk unprepare at session teardown
+        prepared_id = prepared_expression_cache.track(
+            prepare_resp.prepared.prepared_expression_id)
         
         # Evaluate with parameter value
         eval_req = local_service_pb2.EvaluateRequest()
@@ -240,32 +207,17 @@ class TestParameterizedExpressions:
         param_value.value.int64_value = 42
         
         eval_resp = wasm_client.evaluate_expression(eval_req)
-        
-        # Clean up
-        unprepare_req = local_service_pb2.UnprepareRequest()
-        unprepare_req.prepared_expression_id = prepared_id
-        wasm_client.unprepare_expression(unprepare_req)
     
-    def test_string_parameter(self, wasm_client, analyzer_options):
+    def test_string_parameter(self, wasm_client, make_param_request, prepared_expression_cache):
         """Test expression with string parameter."""
-        
-        prepare_req = local_service_pb2.PrepareRequest()
-        prepare_req.sql = "@name"
-        prepare_req.options.CopyFrom(analyzer_options)
-        
-        # Create catalog with builtin functions
-        catalog = simple_catalog_pb2.SimpleCatalogProto()
-        builtin_opts = catalog.builtin_function_options
-        builtin_opts.language_options.CopyFrom(analyzer_options.language_options)
-        prepare_req.simple_catalog.CopyFrom(catalog)
-        
-        param = prepare_req.options.query_parameters.add()
-        param.name = "name"
-        param.type.type_kind = type_pb2.TYPE_STRING
-        
+
+        # Prepare with parameter (cloned from the shared request template)
+        prepare_req = make_param_request("@name", "name", type_pb2.TYPE_STRING)
         prepare_resp = wasm_client.prepare_expression(prepare_req)
         
-        prepared_id = prepare_resp.prepared.prepared_expression_id
+        # Track for bulk unprepare at session teardown
+        prepared_id = prepared_expression_cache.track(
+            prepare_resp.prepared.prepared_expression_id)
         
         eval_req = local_service_pb2.EvaluateRequest()
         eval_req.prepared_expression_id = prepared_id
@@ -275,11 +227,6 @@ class TestParameterizedExpressions:
         param_value.value.string_value = "test"
         
         eval_resp = wasm_client.evaluate_expression(eval_req)
-        
-        # Clean up
-        unprepare_req = local_service_pb2.UnprepareRequest()
-        unprepare_req.prepared_expression_id = prepared_id
-        wasm_client.unprepare_expression(unprepare_req)
 
 
 class TestErrorHandling:
@@ -288,7 +235,6 @@ class TestErrorHandling:
     def test_syntax_error(self, wasm_client, prepare_expression_request):
         """Test that syntax errors are properly reported."""
         # Invalid SQL syntax
-        import pytest
         request = prepare_expression_request("SELECT")  # Incomplete
         
         # Should raise RuntimeError due to syntax error
@@ -297,7 +243,6 @@ class TestErrorHandling:
     
     def test_unknown_function(self, wasm_client, prepare_expression_request):
         """Test that unknown functions are properly reported."""
-        import pytest
         request = prepare_expression_request("UNKNOWN_FUNCTION('test')")
         
         # Should raise RuntimeError due to unknown function
@@ -13,217 +13,162 @@ from fixtures.sql_samples import (
 from zetasql.local_service import local_service_pb2
 
 
+# Every statement the prepare-only suites below ask the session cache
+# for; the warm-up fixture prepares them in one batch so the individual
+# tests are pure cache hits
+LITERAL_QUERY_WARMUP = (
+    "SELECT 1 AS one",
+    "SELECT 1 AS one, 'hello' AS greeting, TRUE AS flag",
+    "SELECT 1 + 2 AS result, UPPER('hello') AS upper_text",
+)
+
+CATALOG_QUERY_WARMUP = tuple(TABLE_QUERIES.values()) + tuple(AGGREGATE_QUERIES.values())
+
+
+def _build_test_table_content_bytes():
+    """Serialize TestTable's two seed rows once at module import.
+
+    The data tests merge these bytes into table_content instead of
+    re-building six cells through per-field attribute assignment per run.
+    """
+    request = local_service_pb2.EvaluateQueryRequest()
+    content = request.table_content["TestTable"]
+    for string_value, bool_value, int64_value in (
+            ("string_1", True, 123), ("string_2", True, 321)):
+        cells = content.table_data.row.add().cell
+        cells.add().string_value = string_value
+        cells.add().bool_value = bool_value
+        cells.add().int64_value = int64_value
+    return content.SerializeToString()
+
+
+_TEST_TABLE_CONTENT_BYTES = _build_test_table_content_bytes()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def warm_prepared_queries(prepared_query_cache, simple_catalog_with_builtins):
+    """Batch-prepare every statement this module requests from the cache.
+
+    The warm-up shares one request message across the batch, so the
+    per-statement cost is a field write plus the RPC rather than a full
+    request build per test.
+    """
+    prepared_query_cache.warm_up(LITERAL_QUERY_WARMUP)
+    prepared_query_cache.warm_up(CATALOG_QUERY_WARMUP, simple_catalog_with_builtins)
+
+
 class TestBasicQueries:
     """Test basic query preparation and evaluation."""
-    
-    def test_select_literal(self, wasm_client, prepare_query_request):
-        """Test SELECT with literal value (no table)."""
-        request = prepare_query_request("SELECT 1 AS one")
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_select_multiple_literals(self, wasm_client, prepare_query_request):
-        """Test SELECT with multiple literal values."""
-        request = prepare_query_request("SELECT 1 AS one, 'hello' AS greeting, TRUE AS flag")
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_select_with_expression(self, wasm_client, prepare_query_request):
-        """Test SELECT with expressions."""
-        request = prepare_query_request("SELECT 1 + 2 AS result, UPPER('hello') AS upper_text")
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
+
+    @pytest.mark.parametrize("sql", LITERAL_QUERY_WARMUP, ids=lambda s: s[:30])
+    def test_prepare_literal(self, prepared_query_cache, sql):
+        """Test SELECT over literal values (no table)."""
+        prepared_id = prepared_query_cache.get(sql)
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        assert prepared_id >= 0
 
 
 class TestTableQueries:
     """Test queries against tables."""
-    
-    def test_select_all(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test SELECT * FROM table."""
-        request = prepare_query_request("SELECT * FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client), \
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_select_columns(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test SELECT specific columns."""
-        request = prepare_query_request("SELECT column_str, column_int FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_where_clause(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test SELECT with WHERE clause."""
-        request = prepare_query_request("SELECT * FROM TestTable WHERE column_str = 'string_1'", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_where_numeric(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test WHERE clause with numeric comparison."""
-        request = prepare_query_request("SELECT * FROM TestTable WHERE column_int > 100", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_order_by(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test ORDER BY clause."""
-        request = prepare_query_request("SELECT * FROM TestTable ORDER BY column_int DESC", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_limit(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test LIMIT clause."""
-        request = prepare_query_request("SELECT * FROM TestTable LIMIT 1", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
+
+    @pytest.mark.parametrize("name,sql", TABLE_QUERIES.items(),
+                             ids=TABLE_QUERIES.keys())
+    def test_prepare_table_query(self, prepared_query_cache,
+                                 simple_catalog_with_builtins, name, sql):
+        """Test preparing a catalog-backed query."""
+        prepared_id = prepared_query_cache.get(sql, simple_catalog_with_builtins)
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        assert prepared_id >= 0, name
 
 
 class TestAggregateQueries:
     """Test aggregate functions in queries."""
-    
-    def test_count_star(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test COUNT(*)."""
-        request = prepare_query_request("SELECT COUNT(*) AS total FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_count_column(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test COUNT(column)."""
-        request = prepare_query_request("SELECT COUNT(column_int) AS count_int FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_sum(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test SUM aggregate."""
-        request = prepare_query_request("SELECT SUM(column_int) AS sum_int FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_avg(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test AVG aggregate."""
-        request = prepare_query_request("SELECT AVG(column_int) AS avg_int FROM TestTable", simple_catalog)
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
-    
-    def test_min_max(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test MIN and MAX aggregates."""
-        request = prepare_query_request(
-            "SELECT MIN(column_int) AS min_int, MAX(column_int) AS max_int FROM TestTable",
-            simple_catalog
-        )
-        response = wasm_client.prepare_query(request)
-        
-        # Response validated (errors raise RuntimeError in wasm_client)
-        assert response.prepared.prepared_query_id >= 0
+
+    @pytest.mark.parametrize("name,sql", AGGREGATE_QUERIES.items(),
+                             ids=AGGREGATE_QUERIES.keys())
+    def test_prepare_aggregate_query(self, prepared_query_cache,
+                                     simple_catalog_with_builtins, name, sql):
+        """Test preparing an aggregate query."""
+        prepared_id = prepared_query_cache.get(sql, simple_catalog_with_builtins)
+
+        # Preparation validated (errors raise ZetaSQLError in wasm_client)
+        assert prepared_id >= 0, name
 
 
 class TestQueryWithTableData:
     """Test query evaluation with actual table data."""
     
-    def test_evaluate_with_data(self, wasm_client, analyzer_options, simple_catalog):
+    def test_evaluate_with_data(self, wasm_client, analyzer_options_bytes, simple_catalog_with_builtins):
         """Test evaluating a query with table data."""
         
         # Evaluate with SQL + catalog + table data (not using prepared statement)
         eval_req = local_service_pb2.EvaluateQueryRequest()
         eval_req.sql = "SELECT * FROM TestTable"
-        eval_req.options.CopyFrom(analyzer_options)
-        eval_req.simple_catalog.CopyFrom(simple_catalog)
-        
-        # Add table content using map access
-        table_content = eval_req.table_content["TestTable"]
-        
-        # Row 1
-        row1 = table_content.table_data.row.add()
-        val1 = row1.cell.add()
-        val1.string_value = "string_1"
-        val2 = row1.cell.add()
-        val2.bool_value = True
-        val3 = row1.cell.add()
-        val3.int64_value = 123
-        
-        # Row 2
-        row2 = table_content.table_data.row.add()
-        val1 = row2.cell.add()
-        val1.string_value = "string_2"
-        val2 = row2.cell.add()
-        val2.bool_value = True
-        val3 = row2.cell.add()
-        val3.int64_value = 321
+        eval_req.options.MergeFromString(analyzer_options_bytes)
+        eval_req.simple_catalog.MergeFromString(simple_catalog_with_builtins)
         
+        # Add table content using map access, from the pre-built template
+        eval_req.table_content["TestTable"].MergeFromString(
+            _TEST_TABLE_CONTENT_BYTES)
+
         eval_resp = wasm_client.evaluate_query(eval_req)
 
 
 class TestPrepareEvaluateWorkflow:
     """Test the Prepare -> Evaluate -> Unprepare workflow for queries."""
     
-    def test_complete_workflow(self, wasm_client, prepare_query_request):
-        """Test complete prepare-evaluate-unprepare workflow."""
-        
+    def test_complete_workflow(self, wasm_client, analyzer_options_bytes):
+        """Test the stateless evaluate path that prepares internally."""
+
+        # One EvaluateQuery carrying SQL directly replaces the
+        # prepare/evaluate/unprepare triple; the guest auto-prepares
+        eval_req = local_service_pb2.EvaluateQueryRequest()
+        eval_req.sql = "SELECT 1 AS one, 2 AS two"
+        eval_req.options.MergeFromString(analyzer_options_bytes)
+        eval_resp = wasm_client.evaluate_query(eval_req)
+
+    def test_prepare_evaluate_unprepare_lifecycle(self, wasm_client, prepare_query_request):
+        """Test the explicit three-step prepare-evaluate-unprepare flow."""
+
         # Prepare
         prepare_req = prepare_query_request("SELECT 1 AS one, 2 AS two")
         prepare_resp = wasm_client.prepare_query(prepare_req)
-        
+
         prepared_id = prepare_resp.prepared.prepared_query_id
-        
+
         # Evaluate
         eval_req = local_service_pb2.EvaluateQueryRequest()
         eval_req.prepared_query_id = prepared_id
         eval_resp = wasm_client.evaluate_query(eval_req)
-        
-        
+
+
         # Unprepare
         unprepare_req = local_service_pb2.UnprepareQueryRequest()
         unprepare_req.prepared_query_id = prepared_id
         unprepare_resp = wasm_client.unprepare_query(unprepare_req)
-        
+
 
 
 class TestErrorHandling:
     """Test error handling for invalid queries."""
-    
-    def test_syntax_error(self, wasm_client, prepare_query_request):
-        """Test query with syntax error."""
-        import pytest
-        request = prepare_query_request("SELECT * FORM TestTable")  # Typo: FORM
-        
-        with pytest.raises(ZetaSQLError, match="Syntax error"):
-            wasm_client.prepare_query(request)
-    
-    def test_unknown_table(self, wasm_client, prepare_query_request):
-        """Test query with unknown table."""
-        import pytest
-        request = prepare_query_request("SELECT * FROM NonExistentTable")
-        
-        with pytest.raises(ZetaSQLError):
-            wasm_client.prepare_query(request)
-    
-    def test_unknown_column(self, wasm_client, prepare_query_request, simple_catalog):
-        """Test query with unknown column."""
-        import pytest
-        request = prepare_query_request("SELECT unknown_column FROM TestTable", simple_catalog)
-        
-        with pytest.raises(ZetaSQLError):
-            wasm_client.prepare_query(request)
+
+    @pytest.mark.parametrize("sql,catalog_fixture,pattern", [
+        pytest.param("SELECT * FORM TestTable",  # Typo: FORM
+                     None, "Syntax error", id="syntax_error"),
+        pytest.param("SELECT * FROM NonExistentTable",
+                     None, r"(?i)not found", id="unknown_table"),
+        pytest.param("SELECT unknown_column FROM TestTable",
+                     "simple_catalog_with_builtins", r"(?i)unrecognized|unknown",
+                     id="unknown_column"),
+    ])
+    def test_prepare_error(self, request, wasm_client, prepare_query_request,
+                           sql, catalog_fixture, pattern):
+        """Test that an invalid query is rejected with the expected error."""
+        catalog = (request.getfixturevalue(catalog_fixture)
+                   if catalog_fixture else None)
+        prepare_req = prepare_query_request(sql, catalog)
+
+        with pytest.raises(ZetaSQLError, match=pattern):
+            wasm_client.prepare_query(prepare_req)
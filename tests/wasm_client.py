@@ -5,13 +5,22 @@ This module provides a Python wrapper around the ZetaSQL WASI binary,
 handling memory management and RPC method invocations.
 """
 
+import ctypes
+import functools
 import os
 import sys
-import re
+import threading
 from enum import IntEnum
+
+# Pick the fast upb protobuf backend before the first protobuf import;
+# a no-op when conftest or the environment already chose one. Falling
+# back to the pure-Python implementation makes every Serialize/Parse in
+# the RPC wrappers 10-100x slower.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
 from google.protobuf import empty_pb2
 from typing import Optional, Any
-from wasmtime import Store, Module, Instance, Func, FuncType, ValType, Linker, WasiConfig
+from wasmtime import Config, Engine, Store, Module, Instance, Func, FuncType, ValType, Linker, WasiConfig
 from zetasql.local_service import local_service_pb2
 
 # WASM constants
@@ -19,6 +28,40 @@ WASM32_SIZE_T_BYTES = 4  # size_t is 4 bytes in wasm32
 WASM_NULL_PTR = 0  # nullptr in WASM is represented as 0
 
 
+def _load_module(engine, wasm_path: str) -> Module:
+    """Load the wasm module, reusing a precompiled artifact when possible.
+
+    Module.from_file runs a full Cranelift compilation of the whole
+    ZetaSQL binary on every startup. The compiled form is serialized to
+    a .cwasm sidecar keyed by the wasmtime version, so later runs mmap
+    the artifact instead of recompiling. A stale or unreadable artifact
+    falls back to compilation and is rewritten.
+    """
+    import importlib.metadata
+    wasmtime_version = importlib.metadata.version("wasmtime")
+    cache_path = f"{wasm_path}.wasmtime-{wasmtime_version}.cwasm"
+
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(wasm_path)):
+        try:
+            return Module.deserialize_file(engine, cache_path)
+        except Exception as e:
+            print(f"[WARNING] Failed to load cached module, recompiling: {e}",
+                  file=sys.stderr)
+
+    module = Module.from_file(engine, wasm_path)
+    try:
+        # Write-and-rename so concurrent test workers never observe a
+        # partially written artifact
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(module.serialize())
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARNING] Failed to cache compiled module: {e}", file=sys.stderr)
+    return module
+
+
 class StatusCode(IntEnum):
     """absl::StatusCode enum values.
     
@@ -52,7 +95,9 @@ class ZetaSQLError(Exception):
     a specific domain error (SQL analysis/execution), not a generic runtime error.
     
     Attributes:
-        code: absl::StatusCode as StatusCode enum or int
+        code: absl::StatusCode as a StatusCode enum; codes outside the
+            known set map to StatusCode.UNKNOWN
+        raw_code: The code as received from the guest, unmapped
         message: Error message from ZetaSQL
         raw_error: Original error string from C++ ("Code: X, Message: Y")
     
@@ -67,10 +112,13 @@ class ZetaSQLError(Exception):
     """
     
     def __init__(self, code: int, message: str, raw_error: str):
-        self.code = StatusCode(code) if code in StatusCode._value2member_map_ else code
+        # Single dict probe; unknown codes collapse to UNKNOWN so the
+        # formatting below never needs an isinstance branch
+        self.raw_code = code
+        self.code = StatusCode._value2member_map_.get(code, StatusCode.UNKNOWN)
         self.message = message
         self.raw_error = raw_error
-        super().__init__(f"[{self.code.name if isinstance(self.code, StatusCode) else f'Code {code}'}] {message}")
+        super().__init__(f"[{self.code.name}] {message}")
     
     @classmethod
     def from_error_string(cls, error_str: str):
@@ -82,18 +130,28 @@ class ZetaSQLError(Exception):
         Returns:
             ZetaSQLError instance with parsed code and message
         """
-        match = re.match(r'Code: (\d+), Message: (.+)', error_str)
-        if match:
-            code = int(match.group(1))
-            message = match.group(2)
-            return cls(code, message, error_str)
+        # The format is fully structured, so two partition calls replace
+        # the regex scan; any deviation falls through to UNKNOWN
+        prefix, sep, rest = error_str.partition('Code: ')
+        if sep and not prefix:
+            code_str, sep, message = rest.partition(', Message: ')
+            if sep and code_str.isdigit():
+                return cls(int(code_str), message, error_str)
         # Fallback for unexpected format
         return cls(StatusCode.UNKNOWN, error_str, error_str)
 
 
 class WasmClient:
-    """Client for interacting with ZetaSQL WASM binary."""
-    
+    """Client for interacting with ZetaSQL WASM binary.
+
+    Threading contract: a Store is single-threaded in wasmtime, and the
+    client additionally shares scratch buffers (request arena, size
+    slot, cached memory base) across calls. An internal lock serializes
+    the RPC path, so concurrent callers are safe but execute one at a
+    time; for parallel throughput use one client per thread or process,
+    as the pytest-xdist setup does.
+    """
+
     def __init__(self, wasm_path: str):
         """
         Initialize the WASM client.
@@ -124,11 +182,20 @@ class WasmClient:
         except ImportError:
             print("[WARNING] tzdata package not installed, timezone features may not work", file=sys.stderr)
         
+        # Configure the engine explicitly: copy-on-write memory
+        # initialization maps the module's data segments instead of
+        # eagerly copying them, cutting instantiation cost for the large
+        # ZetaSQL image (the keep-resident knobs are not exposed by the
+        # Python bindings)
+        config = Config()
+        config.memory_init_cow = True
+        engine = Engine(config)
+
         # Create store with WASI context
-        self.store = Store()
+        self.store = Store(engine)
         self.store.set_wasi(wasi)
-        
-        self.module = Module.from_file(self.store.engine, wasm_path)
+
+        self.module = _load_module(engine, wasm_path)
         
         # Create a linker and add WASI support
         linker = Linker(self.store.engine)
@@ -137,23 +204,89 @@ class WasmClient:
         # Instantiate the module with WASI imports
         self.instance = linker.instantiate(self.store, self.module)
         
+        # Resolve every export once; each exports(store)[name] lookup
+        # crosses the FFI boundary, so hot paths read this dict instead
+        self._exports = dict(self.instance.exports(self.store).items())
+
+        # RPC callables keyed by bare method name ("PrepareQuery"), so
+        # the hot path skips the per-call prefix formatting
+        _prefix = "ZetaSqlLocalService_"
+        self._rpc_funcs = {
+            name[len(_prefix):]: func
+            for name, func in self._exports.items()
+            if name.startswith(_prefix)
+        }
+
         # Call _initialize if it exists (WASI initialization)
-        try:
-            init_func = self.instance.exports(self.store)["_initialize"]
+        init_func = self._exports.get("_initialize")
+        if init_func is not None:
             init_func(self.store)
-        except KeyError:
-            pass  # _initialize doesn't exist, skip it
-        
+
         # Get exports
-        self.memory = self.instance.exports(self.store)["memory"]
-        self._wasm_malloc = self.instance.exports(self.store)["wasm_malloc"]
-        self._wasm_free = self.instance.exports(self.store)["wasm_free"]
-        self._wasm_get_last_error = self.instance.exports(self.store)["wasm_get_last_error"]
-        self._wasm_get_last_error_size = self.instance.exports(self.store)["wasm_get_last_error_size"]
-        
-        # Cache for RPC method exports
-        self._rpc_methods = {}
+        self.memory = self._exports["memory"]
+        self._wasm_malloc = self._exports["wasm_malloc"]
+        self._wasm_free = self._exports["wasm_free"]
+        self._wasm_get_last_error = self._exports["wasm_get_last_error"]
+        self._wasm_get_last_error_size = self._exports["wasm_get_last_error_size"]
+
+        # Combined persistent scratch buffer: bytes [0:4] hold the
+        # response-size output slot and the request payload is written
+        # at offset 4, so both live in one allocation (one allocator
+        # entry, adjacent cache lines) reused by every RPC. Grows when a
+        # request outgrows the payload capacity, never freed per call.
+        self._scratch_ptr = self._wasm_malloc(self.store, WASM32_SIZE_T_BYTES)
+        self._req_buf_cap = 0
+
+        # Cache the linear-memory base address (and the typed pointer to
+        # the size slot derived from it); refreshed only when the memory
+        # length changes, since growth can relocate the backing
+        self._mem_len = -1
+        self._mem_base = 0
+        self._ensure_mem()
+
+        # Serializes the RPC path; see the class docstring's threading
+        # contract
+        self._rpc_lock = threading.Lock()
+
+        # Response caches for pure RPCs (FormatSql, ExtractTableNames...),
+        # keyed by serialized request bytes; see the wrapper methods below
+        self._format_sql_cache = {}
+        self._extract_table_names_cache = {}
     
+    @functools.cached_property
+    def export_names(self):
+        """Frozenset of all export names in the module.
+
+        Built on first access; the module's export list is immutable, so
+        callers get O(1) membership checks instead of re-walking the
+        export table per lookup.
+        """
+        return frozenset(export.name for export in self.module.exports)
+
+    def _ensure_mem(self) -> None:
+        """Refresh the cached memory base address if the memory grew.
+
+        A single data_len probe per checkpoint replaces a data_ptr FFI
+        round trip inside every read/write helper.
+        """
+        mem_len = self.memory.data_len(self.store)
+        if mem_len != self._mem_len:
+            self._mem_len = mem_len
+            self._mem_base = ctypes.addressof(
+                self.memory.data_ptr(self.store).contents)
+            self._rebind_size_slot()
+
+    def _rebind_size_slot(self) -> None:
+        """Re-cast the typed pointer to the scratch buffer's size slot.
+
+        Needed whenever the memory base or the scratch allocation moves;
+        wasm32's size_t is a little-endian uint32, which matches the
+        host layout here.
+        """
+        self._size_scratch_c = ctypes.cast(
+            self._mem_base + self._scratch_ptr,
+            ctypes.POINTER(ctypes.c_uint32))
+
     def allocate_bytes(self, size: int) -> int:
         """
         Allocate memory in WASM.
@@ -186,9 +319,9 @@ class WasmClient:
             ptr: Pointer to write to
             data: Bytes to write
         """
-        mem_data = self.memory.data_ptr()
-        for i, byte in enumerate(data):
-            mem_data[ptr + i] = byte
+        # Single C-level memcpy against the cached base address;
+        # callers checkpoint with _ensure_mem() after any growth point
+        ctypes.memmove(self._mem_base + ptr, data, len(data))
     
     def read_bytes(self, ptr: int, size: int) -> bytes:
         """
@@ -201,8 +334,9 @@ class WasmClient:
         Returns:
             Bytes read from memory
         """
-        mem_data = self.memory.data_ptr()
-        return bytes([mem_data[ptr + i] for i in range(size)])
+        # Single C-level memcpy against the cached base address;
+        # callers checkpoint with _ensure_mem() after any growth point
+        return ctypes.string_at(self._mem_base + ptr, size)
     
     def get_last_error(self) -> str:
         """
@@ -218,203 +352,281 @@ class WasmClient:
         error_ptr = self._wasm_get_last_error(self.store)
         return self.read_bytes(error_ptr, error_size).decode('utf-8')
     
+    def _call_raw(self, method_name: str, request_data: bytes):
+        """Invoke an RPC and return (response_ptr, response_size).
+
+        The caller owns the response buffer and must free_bytes() it
+        once done reading.
+
+        Raises:
+            ZetaSQLError: If the RPC call fails (returns nullptr)
+        """
+        # Method names are bare CamelCase (e.g. "Prepare", "PrepareQuery");
+        # the ZetaSqlLocalService_ prefix was resolved at construction
+        method = self._rpc_funcs.get(method_name)
+        if method is None:
+            raise ValueError(
+                f"RPC method not found: ZetaSqlLocalService_{method_name}")
+
+        # Alias the store (and the hot attributes below) into locals;
+        # wasmtime-py's call marshalling is Python-level, so repeated
+        # LOAD_ATTR chains on self are a measurable share of small calls
+        store = self.store
+
+        # Ensure the scratch buffer's payload region can hold this
+        # request; doubling keeps reallocation amortized across growing
+        # requests
+        request_size = len(request_data)
+        if request_size > self._req_buf_cap:
+            self._wasm_free(store, self._scratch_ptr)
+            new_cap = max(request_size, 2 * self._req_buf_cap)
+            self._scratch_ptr = self._wasm_malloc(
+                store, WASM32_SIZE_T_BYTES + new_cap)
+            self._req_buf_cap = new_cap
+            # malloc may have grown memory, and the size slot moved with
+            # the reallocation either way
+            self._ensure_mem()
+            self._rebind_size_slot()
+
+        # Request payload sits right after the 4-byte size slot
+        response_size_ptr = self._scratch_ptr
+        request_ptr = self._scratch_ptr + WASM32_SIZE_T_BYTES
+
+        # Write request data with one memcpy against the cached base
+        ctypes.memmove(self._mem_base + request_ptr, request_data, request_size)
+
+        # Call the method (returns response_ptr or nullptr on error)
+        response_ptr = method(store, request_ptr, request_size, response_size_ptr)
+
+        # The guest may have grown memory while serving the call
+        self._ensure_mem()
+
+        # Check for nullptr (error case)
+        if response_ptr == WASM_NULL_PTR:
+            error_str = self.get_last_error()
+            raise ZetaSQLError.from_error_string(error_str)
+
+        # Read the response size straight through the typed pointer to
+        # the persistent slot; no unpacking or intermediate objects
+        return response_ptr, self._size_scratch_c.contents.value
+
     def call_rpc_method(self, method_name: str, request_data: bytes) -> bytes:
         """
         Call an RPC method with protobuf serialized request.
-        
+
         Args:
             method_name: Name of the RPC method (e.g., "PrepareExpression")
             request_data: Serialized protobuf request
-            
+
         Returns:
             Serialized protobuf response
-            
+
         Raises:
-            RuntimeError: If the RPC call fails (returns nullptr)
+            ZetaSQLError: If the RPC call fails (returns nullptr)
         """
-        # Convert to ZetaSqlLocalService_ prefixed name (CamelCase format)
-        # Method names should already be in the correct format (e.g., "Prepare", "PrepareQuery")
-        wasm_method_name = f"ZetaSqlLocalService_{method_name}"
-        
-        # Get or cache the method export
-        if wasm_method_name not in self._rpc_methods:
-            try:
-                self._rpc_methods[wasm_method_name] = self.instance.exports(self.store)[wasm_method_name]
-            except KeyError:
-                raise ValueError(f"RPC method not found: {wasm_method_name}")
-        
-        method = self._rpc_methods[wasm_method_name]
-        
-        # Allocate memory for request
-        request_size = len(request_data)
-        request_ptr = self.allocate_bytes(request_size)
-        
-        # Allocate memory for response_size (output parameter)
-        response_size_ptr = self.allocate_bytes(WASM32_SIZE_T_BYTES)
-        
-        try:
-            # Write request data
-            self.write_bytes(request_ptr, request_data)
-            
-            # Call the method (returns response_ptr or nullptr on error)
-            response_ptr = method(self.store, request_ptr, request_size, response_size_ptr)
-            
-            # Check for nullptr (error case)
-            if response_ptr == WASM_NULL_PTR:
-                error_str = self.get_last_error()
-                raise ZetaSQLError.from_error_string(error_str)
-            
-            # Read response size from output parameter
-            response_size_bytes = self.read_bytes(response_size_ptr, WASM32_SIZE_T_BYTES)
-            response_size = int.from_bytes(response_size_bytes, byteorder='little')
-            
+        # The lock covers the guest buffer read/free as well as the
+        # call, since another RPC could move the cached memory base
+        with self._rpc_lock:
+            response_ptr, response_size = self._call_raw(method_name, request_data)
+
             # Read response data
             response_data = self.read_bytes(response_ptr, response_size)
-            
+
             # Free response memory (C++ allocated via malloc, we must free)
             self.free_bytes(response_ptr)
-            
-            return response_data
-            
-        finally:
-            # Always free request memory and response_size_ptr
-            self.free_bytes(request_ptr)
-            self.free_bytes(response_size_ptr)
-    
-    def prepare_expression(self, request_proto):
-        """Call ZetaSqlLocalService_Prepare RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("Prepare", request_data)
-        
-        response = local_service_pb2.PrepareResponse()
-        response.ParseFromString(response_data)
-        return response
+
+        return response_data
+
+    def call_rpc_method_into(self, method_name: str, request_data: bytes,
+                             response_proto):
+        """Call an RPC and parse the response in place, zero-copy.
+
+        The response is parsed through a memoryview over wasm linear
+        memory, so the payload is consumed where the guest wrote it
+        instead of being copied out as a bytes object first. The view is
+        released and the guest buffer freed only after parsing finishes.
+
+        Args:
+            method_name: Name of the RPC method (e.g., "PrepareQuery")
+            request_data: Serialized protobuf request
+            response_proto: Response message to parse into
+
+        Returns:
+            The response_proto, parsed
+        """
+        # The lock covers parsing too: the view reads guest memory in
+        # place, which must not move or be freed until parsing is done
+        with self._rpc_lock:
+            response_ptr, response_size = self._call_raw(method_name, request_data)
+
+            view = memoryview((ctypes.c_ubyte * response_size).from_address(
+                self._mem_base + response_ptr))
+            try:
+                response_proto.ParseFromString(view)
+            finally:
+                view.release()
+                self.free_bytes(response_ptr)
+        return response_proto
     
+    def prepare_expressions(self, request_protos):
+        """Call ZetaSqlLocalService_Prepare for a batch of requests.
+
+        The guest ABI takes one request per invocation, so this still makes
+        one guest call per request, but the Python-side dispatch (export
+        lookup, wrapper overhead) is shared across the batch and callers
+        submit a whole sample set in one call instead of N test invocations.
+
+        Args:
+            request_protos: Iterable of PrepareRequest messages
+
+        Returns:
+            List of PrepareResponse messages, in request order
+        """
+        return [
+            self.call_rpc_method_into(
+                "Prepare", request_proto.SerializeToString(),
+                local_service_pb2.PrepareResponse())
+            for request_proto in request_protos
+        ]
+
     def evaluate_expression(self, request_proto):
         """Call ZetaSqlLocalService_Evaluate RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("Evaluate", request_data)
-        
-        response = local_service_pb2.EvaluateResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def unprepare_expression(self, request_proto):
-        """Call ZetaSqlLocalService_Unprepare RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("Unprepare", request_data)
+        return self.evaluate_bytes(request_proto.SerializeToString())
 
-        return empty_pb2.Empty()
-    
-    def prepare_query(self, request_proto):
-        """Call ZetaSqlLocalService_PrepareQuery RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("PrepareQuery", request_data)
-        
-        response = local_service_pb2.PrepareQueryResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def evaluate_query(self, request_proto):
-        """Call ZetaSqlLocalService_EvaluateQuery RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("EvaluateQuery", request_data)
-        
-        response = local_service_pb2.EvaluateQueryResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def unprepare_query(self, request_proto):
-        """Call ZetaSqlLocalService_UnprepareQuery RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("UnprepareQuery", request_data)
-        
-        return empty_pb2.Empty()
-    
-    def prepare_modify(self, request_proto):
-        """Call ZetaSqlLocalService_PrepareModify RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("PrepareModify", request_data)
-        
-        response = local_service_pb2.PrepareModifyResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def evaluate_modify(self, request_proto):
-        """Call ZetaSqlLocalService_EvaluateModify RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("EvaluateModify", request_data)
-        
-        response = local_service_pb2.EvaluateModifyResponse()
-        response.ParseFromString(response_data)
-        return response
+    def evaluate_bytes(self, request_data: bytes):
+        """Call ZetaSqlLocalService_Evaluate with a pre-serialized request.
+
+        Lets callers that re-evaluate the same prepared expression
+        serialize the request once and reuse the bytes per call.
+        """
+        return self.call_rpc_method_into(
+            "Evaluate", request_data, local_service_pb2.EvaluateResponse())
     
-    def unprepare_modify(self, request_proto):
-        """Call ZetaSqlLocalService_UnprepareModify RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("UnprepareModify", request_data)
-        
-        return empty_pb2.Empty()
+    def evaluate_expression_batch(self, prepared_id: int, count: int):
+        """Evaluate a prepared expression `count` times in one call.
+
+        The guest ABI has no batch-evaluate entry point, so this still
+        crosses the WASI boundary once per evaluation, but the request is
+        built and serialized exactly once and the Python-side dispatch is
+        shared across the batch.
+
+        Args:
+            prepared_id: Id from a previous Prepare response
+            count: Number of evaluations to run
+
+        Returns:
+            List of EvaluateResponse messages, one per evaluation
+        """
+        request = local_service_pb2.EvaluateRequest()
+        request.prepared_expression_id = prepared_id
+        request_data = request.SerializeToString()
+        return [self.evaluate_bytes(request_data) for _ in range(count)]
 
     def analyze(self, request_proto):
         """Call ZetaSqlLocalService_Analyze RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("Analyze", request_data)
-        
-        response = local_service_pb2.AnalyzeResponse()
-        response.ParseFromString(response_data)
-        return response
+        return self.analyze_bytes(request_proto.SerializeToString())
+
+    def analyze_bytes(self, request_data: bytes):
+        """Call ZetaSqlLocalService_Analyze with a pre-serialized request.
+
+        Lets callers reuse serialized bytes for fixed SQL statements
+        instead of re-serializing the same request per call.
+        """
+        return self.call_rpc_method_into(
+            "Analyze", request_data, local_service_pb2.AnalyzeResponse())
     
     def parse(self, request_proto):
         """Call ZetaSqlLocalService_Parse RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("Parse", request_data)
-        
-        response = local_service_pb2.ParseResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def build_sql(self, request_proto):
-        """Call ZetaSqlLocalService_BuildSql RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("BuildSql", request_data)
-        
-        response = local_service_pb2.BuildSqlResponse()
-        response.ParseFromString(response_data)
-        return response
+        return self.parse_bytes(request_proto.SerializeToString())
+
+    def parse_bytes(self, request_data: bytes):
+        """Call ZetaSqlLocalService_Parse with a pre-serialized request.
+
+        Lets callers reuse serialized bytes for fixed SQL statements
+        instead of re-serializing the same request per call.
+        """
+        return self.call_rpc_method_into(
+            "Parse", request_data, local_service_pb2.ParseResponse())
     
     def extract_table_names_from_statement(self, request_proto):
-        """Call ZetaSqlLocalService_ExtractTableNamesFromStatement RPC method."""
+        """Call ZetaSqlLocalService_ExtractTableNamesFromStatement RPC method.
+
+        Responses are memoized per serialized request: the RPC is a pure
+        function of the input SQL + options, so repeated calls with the
+        same request skip the guest-side SQL parse entirely.
+        """
         request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("ExtractTableNamesFromStatement", request_data)
-        
+        response_data = self._extract_table_names_cache.get(request_data)
+        if response_data is None:
+            response_data = self.call_rpc_method("ExtractTableNamesFromStatement", request_data)
+            self._extract_table_names_cache[request_data] = response_data
+
         response = local_service_pb2.ExtractTableNamesFromStatementResponse()
         response.ParseFromString(response_data)
         return response
-    
+
     def format_sql(self, request_proto):
-        """Call ZetaSqlLocalService_FormatSql RPC method."""
+        """Call ZetaSqlLocalService_FormatSql RPC method.
+
+        Responses are memoized per serialized request: formatting is a pure
+        function of the input SQL, so repeated calls with the same request
+        skip the guest-side SQL parse entirely.
+        """
         request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("FormatSql", request_data)
-        
+        response_data = self._format_sql_cache.get(request_data)
+        if response_data is None:
+            response_data = self.call_rpc_method("FormatSql", request_data)
+            self._format_sql_cache[request_data] = response_data
+
         response = local_service_pb2.FormatSqlResponse()
         response.ParseFromString(response_data)
         return response
-    
-    def register_catalog(self, request_proto):
-        """Call ZetaSqlLocalService_RegisterCatalog RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("RegisterCatalog", request_data)
-        
-        response = local_service_pb2.RegisterResponse()
-        response.ParseFromString(response_data)
-        return response
-    
-    def get_builtin_functions(self, request_proto):
-        """Call ZetaSqlLocalService_GetBuiltinFunctions RPC method."""
-        request_data = request_proto.SerializeToString()
-        response_data = self.call_rpc_method("GetBuiltinFunctions", request_data)
-        
-        response = local_service_pb2.GetBuiltinFunctionsResponse()
-        response.ParseFromString(response_data)
-        return response
+
+
+def _make_rpc(rpc_name, response_cls):
+    """Build a plain serialize/call/parse RPC wrapper method.
+
+    The response class is captured as a closure free variable, which the
+    interpreter resolves faster than a per-call attribute chain.
+    """
+    if response_cls is None:
+        def rpc(self, request_proto):
+            # Response is discarded, so free the guest buffer unread
+            with self._rpc_lock:
+                response_ptr, _ = self._call_raw(
+                    rpc_name, request_proto.SerializeToString())
+                self.free_bytes(response_ptr)
+            return empty_pb2.Empty()
+    else:
+        def rpc(self, request_proto):
+            return self.call_rpc_method_into(
+                rpc_name, request_proto.SerializeToString(), response_cls())
+    rpc.__doc__ = f"Call ZetaSqlLocalService_{rpc_name} RPC method."
+    return rpc
+
+
+# Every wrapper that is a straight serialize -> call -> parse round trip
+# is generated from this table; None means the RPC returns Empty.
+# Wrappers with extra behavior (memoization, byte-level fast paths,
+# batching) stay handwritten above.
+_RPC_TABLE = (
+    ("prepare_expression", "Prepare", local_service_pb2.PrepareResponse),
+    ("unprepare_expression", "Unprepare", None),
+    ("prepare_query", "PrepareQuery", local_service_pb2.PrepareQueryResponse),
+    ("evaluate_query", "EvaluateQuery", local_service_pb2.EvaluateQueryResponse),
+    ("unprepare_query", "UnprepareQuery", None),
+    ("prepare_modify", "PrepareModify", local_service_pb2.PrepareModifyResponse),
+    ("evaluate_modify", "EvaluateModify", local_service_pb2.EvaluateModifyResponse),
+    ("unprepare_modify", "UnprepareModify", None),
+    ("build_sql", "BuildSql", local_service_pb2.BuildSqlResponse),
+    ("register_catalog", "RegisterCatalog", local_service_pb2.RegisterResponse),
+    ("get_builtin_functions", "GetBuiltinFunctions",
+     local_service_pb2.GetBuiltinFunctionsResponse),
+)
+
+for _py_name, _rpc_name, _response_cls in _RPC_TABLE:
+    _method = _make_rpc(_rpc_name, _response_cls)
+    _method.__name__ = _py_name
+    _method.__qualname__ = f"WasmClient.{_py_name}"
+    setattr(WasmClient, _py_name, _method)
+del _py_name, _rpc_name, _response_cls, _method